@@ -40,8 +40,8 @@ def get_user_choice(prompt, options):
         except ValueError:
             print("Please enter a number.")
 
-def main():
-    """Main execution function"""
+def configure_and_run() -> bool:
+    """Run one configured experiment; return True if another run was requested"""
     print_header()
     
     # Get configuration from user
@@ -102,11 +102,13 @@ def main():
     results_file = f"results/experiment_{algorithm}_{timestamp}.txt"
     
     os.makedirs("results", exist_ok=True)
+    # Build the report once and write it in a single call instead of
+    # one tiny write per metric
+    report_text = "\n".join(
+        [f"Experiment Results - {timestamp}", "=" * 50] +
+        [f"{key}: {value}" for key, value in results.items()]) + "\n"
     with open(results_file, 'w') as f:
-        f.write(f"Experiment Results - {timestamp}\n")
-        f.write("="*50 + "\n")
-        for key, value in results.items():
-            f.write(f"{key}: {value}\n")
+        f.write(report_text)
     
     print(f"\n✅ Results saved to: {results_file}")
     
@@ -131,14 +133,23 @@ def main():
     print("  3. Exit")
     
     choice = input("Enter choice (1/2/3): ")
-    
+
     if choice == "1":
-        print("\n" + "="*60 + "\n")
-        main()
+        return True
     elif choice == "2":
         os.startfile("results")
     else:
         print("\nThank you for using the RL Agentic System!")
+    return False
+
+def main():
+    """Main execution function"""
+    # Explicit loop instead of recursive main() calls, so repeated runs
+    # don't grow the call stack
+    while True:
+        if not configure_and_run():
+            break
+        print("\n" + "="*60 + "\n")
 
 if __name__ == "__main__":
     try:
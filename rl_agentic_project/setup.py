@@ -0,0 +1,18 @@
+"""
+Build script for the optional Cython Q-learning extension
+
+Usage:
+    pip install cython
+    python setup.py build_ext --inplace
+
+The project runs fine without it; rl_agent.py exposes the compiled
+agent only when the extension has been built.
+"""
+
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+setup(
+    name="rl-agentic-cython-ext",
+    ext_modules=cythonize([Extension("src.rl_agent_cy", ["src/rl_agent_cy.pyx"])]),
+)
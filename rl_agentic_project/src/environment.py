@@ -3,36 +3,126 @@ Tutorial Environment for RL Agent
 """
 
 import numpy as np
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
 from rl_agent import State
 
+try:
+    import numba
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+# Hot-path constant tables, hoisted so no call allocates them
+_DIFF_FACTORS = np.array([1.3, 1.0, 0.7, 0.5], dtype=np.float32)   # Easy to Expert
+_REWARD_SUCCESS = np.array([2, 4, 6, 8], dtype=np.float32)
+_REWARD_FAIL = np.array([-4, -3, -2, -1], dtype=np.float32)
+
+# Learner profiles shared by the scalar and vectorized environments
+LEARNER_PROFILES = {
+    "fast": {
+        "base_prob": 0.8,
+        "learn_rate": 0.15,
+        "fatigue_rate": 0.01
+    },
+    "average": {
+        "base_prob": 0.6,
+        "learn_rate": 0.08,
+        "fatigue_rate": 0.02
+    },
+    "slow": {
+        "base_prob": 0.4,
+        "learn_rate": 0.04,
+        "fatigue_rate": 0.03
+    }
+}
+
+def _step_kernel(performance, streak, fatigue, action, rand_u,
+                 base_prob, learn_rate, fatigue_rate):
+    """
+    Scalar per-step kernel: success probability, reward, and state update
+
+    Pure numeric code with no attribute access so numba can compile it;
+    mirrors _calculate_success_probability and _calculate_reward exactly.
+    Returns (new_perf, new_streak, new_fatigue, reward, success, success_prob).
+    """
+    # Base difficulty factors (Easy to Expert)
+    if action == 0:
+        factor = 1.3
+    elif action == 1:
+        factor = 1.0
+    elif action == 2:
+        factor = 0.7
+    else:
+        factor = 0.5
+
+    prob = base_prob * performance * factor * (1.0 - fatigue)
+    prob += min(0.1, streak * 0.02)
+    if prob < 0.05:
+        prob = 0.05
+    elif prob > 0.95:
+        prob = 0.95
+
+    success = rand_u < prob
+
+    if success:
+        reward = (action + 1) * 2.0
+        if streak > 3:
+            reward += 1.0
+        if streak > 5:
+            reward += 1.0
+    else:
+        reward = -(4.0 - action)
+
+    if 0.4 <= prob <= 0.7:
+        reward += 0.5
+    if performance > 0.7 and action == 0:
+        reward -= 1.0
+    if performance < 0.3 and action == 3:
+        reward -= 1.0
+
+    if success:
+        new_perf = min(1.0, performance + learn_rate)
+        new_streak = streak + 1
+    else:
+        new_perf = max(0.0, performance - learn_rate / 2.0)
+        new_streak = 0
+    new_fatigue = min(0.5, fatigue + fatigue_rate)
+
+    return new_perf, new_streak, new_fatigue, reward, success, prob
+
+if HAVE_NUMBA:
+    _step_kernel = numba.njit(cache=True)(_step_kernel)
+
 class TutorialEnvironment:
     """Simulated adaptive tutorial environment"""
-    
-    def __init__(self, learner_type: str = "average"):
+
+    def __init__(self, learner_type: str = "average", seed: Optional[int] = None):
         """Initialize environment with learner profile"""
-        self.learner_profiles = {
-            "fast": {
-                "base_prob": 0.8,
-                "learn_rate": 0.15,
-                "fatigue_rate": 0.01
-            },
-            "average": {
-                "base_prob": 0.6,
-                "learn_rate": 0.08,
-                "fatigue_rate": 0.02
-            },
-            "slow": {
-                "base_prob": 0.4,
-                "learn_rate": 0.04,
-                "fatigue_rate": 0.03
-            }
-        }
-        
+        self.learner_profiles = LEARNER_PROFILES
+
         self.profile = self.learner_profiles[learner_type]
         self.difficulties = ["Easy", "Medium", "Hard", "Expert"]
+        self._rng = np.random.default_rng(seed)
+        self._build_prob_lut()
         self.reset()
-        
+
+    def _build_prob_lut(self):
+        """
+        Precompute success probabilities for every bucketed state
+
+        Performance is already bucketed to 11 values and streak to 6;
+        quantizing fatigue to 11 buckets leaves only ~2.9k combinations,
+        so the whole formula collapses to one table read.
+        """
+        perf = np.arange(11).reshape(-1, 1, 1, 1) / 10
+        streak = np.arange(6).reshape(1, -1, 1, 1)
+        factor = _DIFF_FACTORS.reshape(1, 1, -1, 1)
+        fatigue = np.arange(11).reshape(1, 1, 1, -1) / 20
+
+        prob = self.profile["base_prob"] * perf * factor * (1 - fatigue)
+        prob = prob + np.minimum(0.1, streak * 0.02)
+        self._prob_lut = np.clip(prob, 0.05, 0.95).astype(np.float32)
+
     def reset(self) -> State:
         """Reset environment to initial state"""
         self.state = State(
@@ -42,6 +132,10 @@ class TutorialEnvironment:
             difficulty=1  # Start with medium
         )
         self.fatigue = 0
+        # Pre-draw one uniform per question so step avoids a Python->C
+        # RNG round trip on every call
+        self._u = self._rng.random(20)
+        self._step_i = 0
         return self.state
     
     def step(self, action: int) -> Tuple[State, float, bool, Dict]:
@@ -51,30 +145,24 @@ class TutorialEnvironment:
         Args:
             action: Difficulty level (0=Easy, 1=Medium, 2=Hard, 3=Expert)
         """
-        # Calculate success probability
-        success_prob = self._calculate_success_probability(action)
-        success = np.random.random() < success_prob
-        
-        # Calculate reward
-        reward = self._calculate_reward(action, success)
-        
-        # Update state
+        # Refill the pre-drawn buffer if stepped past an episode boundary
+        if self._step_i >= self._u.size:
+            self._u = self._rng.random(20)
+            self._step_i = 0
+        rand_u = self._u[self._step_i]
+        self._step_i += 1
+
+        # Run the compiled per-step kernel (probability, reward, state update)
         old_performance = self.state.performance
-        
-        if success:
-            # Improve performance
-            self.state.performance = min(1.0, 
-                self.state.performance + self.profile["learn_rate"])
-            self.state.streak += 1
-        else:
-            # Decrease performance
-            self.state.performance = max(0.0, 
-                self.state.performance - self.profile["learn_rate"] / 2)
-            self.state.streak = 0
-        
-        # Update fatigue
-        self.fatigue = min(0.5, self.fatigue + self.profile["fatigue_rate"])
-        
+        new_perf, new_streak, new_fatigue, reward, success, success_prob = _step_kernel(
+            self.state.performance, self.state.streak, self.fatigue, action,
+            rand_u, self.profile["base_prob"],
+            self.profile["learn_rate"], self.profile["fatigue_rate"])
+
+        self.state.performance = new_perf
+        self.state.streak = new_streak
+        self.fatigue = new_fatigue
+
         # Update counters
         self.state.questions_answered += 1
         self.state.difficulty = action
@@ -93,27 +181,15 @@ class TutorialEnvironment:
         return self.state, reward, done, info
     
     def _calculate_success_probability(self, difficulty: int) -> float:
-        """Calculate probability of correct answer based on difficulty and state"""
-        # Base difficulty factors
-        difficulty_factors = [1.3, 1.0, 0.7, 0.5]  # Easy to Expert
-        
-        # Calculate base probability
-        base_prob = self.profile["base_prob"] * self.state.performance
-        
-        # Apply difficulty factor
-        prob = base_prob * difficulty_factors[difficulty]
-        
-        # Apply fatigue penalty
-        prob *= (1 - self.fatigue)
-        
-        # Add streak bonus (max 10% bonus)
-        streak_bonus = min(0.1, self.state.streak * 0.02)
-        prob += streak_bonus
-        
-        # Ensure probability is between 0 and 0.95
-        return np.clip(prob, 0.05, 0.95)
+        """Look up probability of correct answer for the bucketed state"""
+        return self._prob_lut[
+            int(self.state.performance * 10),
+            min(self.state.streak, 5),
+            difficulty,
+            min(int(self.fatigue * 20), 10)]
     
-    def _calculate_reward(self, difficulty: int, success: bool) -> float:
+    def _calculate_reward(self, difficulty: int, success: bool,
+                          success_prob: float) -> float:
         """
         Calculate reward based on action and outcome
         
@@ -123,34 +199,111 @@ class TutorialEnvironment:
         - Penalties for failures (less severe for harder questions)
         - Bonus for optimal challenge level
         """
-        reward = 0
-        
-        if success:
-            # Base reward for success (higher for harder questions)
-            reward = (difficulty + 1) * 2  # 2, 4, 6, 8
-            
-            # Streak bonus
-            if self.state.streak > 3:
-                reward += 1
-            if self.state.streak > 5:
-                reward += 1
-                
-        else:
-            # Penalty for failure (less severe for harder questions)
-            reward = -(4 - difficulty)  # -4, -3, -2, -1
-        
+        # Table lookups plus boolean arithmetic keep this branchless:
+        # base reward/penalty (2,4,6,8 on success; -4,-3,-2,-1 on failure)
+        reward = success * _REWARD_SUCCESS[difficulty] + (not success) * _REWARD_FAIL[difficulty]
+
+        # Streak bonuses on success
+        reward += success * ((self.state.streak > 3) + (self.state.streak > 5))
+
         # Bonus for optimal difficulty
         # (where success probability is between 0.4 and 0.7)
-        success_prob = self._calculate_success_probability(difficulty)
-        if 0.4 <= success_prob <= 0.7:
-            reward += 0.5  # Optimal challenge bonus
-        
+        reward += 0.5 * (0.4 <= success_prob <= 0.7)
+
         # Penalty for too easy questions when performance is high
-        if self.state.performance > 0.7 and difficulty == 0:
-            reward -= 1
-        
+        reward -= self.state.performance > 0.7 and difficulty == 0
+
         # Penalty for too hard questions when performance is low
-        if self.state.performance < 0.3 and difficulty == 3:
-            reward -= 1
-        
-        return reward 
\ No newline at end of file
+        reward -= self.state.performance < 0.3 and difficulty == 3
+
+        return reward
+
+class VectorTutorialEnv:
+    """Vectorized tutorial environment stepping N learners in lockstep
+
+    State is kept as structure-of-arrays so each step is a handful of
+    NumPy kernels over all lanes instead of N Python-level env.step calls.
+    Finished lanes are reset in place (autoreset) so rollouts never stall.
+    """
+
+    def __init__(self, n_envs: int = 8, learner_type: str = "average",
+                 episode_length: int = 20, seed: Optional[int] = None):
+        """Initialize n_envs parallel environments with one learner profile"""
+        self.n_envs = n_envs
+        self.profile = LEARNER_PROFILES[learner_type]
+        self.episode_length = episode_length
+        self.difficulties = ["Easy", "Medium", "Hard", "Expert"]
+        self._rng = np.random.default_rng(seed)
+        self.reset()
+
+    def reset(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Reset all lanes to the initial learner state"""
+        n = self.n_envs
+        self.performance = np.full(n, 0.5)
+        self.streak = np.zeros(n, dtype=np.int64)
+        self.questions_answered = np.zeros(n, dtype=np.int64)
+        self.difficulty = np.ones(n, dtype=np.int64)  # Start with medium
+        self.fatigue = np.zeros(n)
+        return self.states()
+
+    def states(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the observable state as (performance, streak, difficulty) arrays"""
+        return self.performance, self.streak, self.difficulty
+
+    def _reset_lanes(self, mask: np.ndarray):
+        """Reset the lanes selected by mask in place"""
+        self.performance[mask] = 0.5
+        self.streak[mask] = 0
+        self.questions_answered[mask] = 0
+        self.difficulty[mask] = 1
+        self.fatigue[mask] = 0
+
+    def step(self, actions: np.ndarray) -> Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray],
+                                                 np.ndarray, np.ndarray, Dict]:
+        """
+        Execute one action per lane and return new states, rewards, done flags, and info
+
+        Args:
+            actions: int array of shape (n_envs,) with difficulty levels
+                     (0=Easy, 1=Medium, 2=Hard, 3=Expert)
+        """
+        # Success probability for every lane in one pass
+        prob = self.profile["base_prob"] * self.performance
+        prob = prob * _DIFF_FACTORS[actions]
+        prob *= (1 - self.fatigue)
+        prob += np.minimum(0.1, self.streak * 0.02)
+        prob = np.clip(prob, 0.05, 0.95)
+
+        success = self._rng.random(self.n_envs) < prob
+
+        # Rewards, mirroring TutorialEnvironment._calculate_reward branch by branch
+        rewards = np.where(success, _REWARD_SUCCESS[actions], _REWARD_FAIL[actions])
+        rewards += success * ((self.streak > 3) + (self.streak > 5)).astype(float)
+        rewards += 0.5 * ((prob >= 0.4) & (prob <= 0.7))
+        rewards -= (self.performance > 0.7) & (actions == 0)
+        rewards -= (self.performance < 0.3) & (actions == 3)
+
+        # State updates across all lanes
+        learn_rate = self.profile["learn_rate"]
+        self.performance = np.where(
+            success,
+            np.minimum(1.0, self.performance + learn_rate),
+            np.maximum(0.0, self.performance - learn_rate / 2))
+        self.streak = np.where(success, self.streak + 1, 0)
+        self.fatigue = np.minimum(0.5, self.fatigue + self.profile["fatigue_rate"])
+        self.questions_answered += 1
+        self.difficulty = np.asarray(actions, dtype=np.int64).copy()
+
+        done = self.questions_answered >= self.episode_length
+
+        info = {
+            "success": success,
+            "success_probability": prob,
+            "final_performance": self.performance.copy()
+        }
+
+        # Autoreset finished lanes so the batch keeps rolling
+        if done.any():
+            self._reset_lanes(done)
+
+        return self.states(), rewards, done, info 
\ No newline at end of file
@@ -2,33 +2,168 @@
 Experiment Runner for RL Agents
 """
 
+import math
 import numpy as np
 import time
-from typing import Dict, List
-from rl_agent import QLearningAgent, ThompsonSamplingAgent, HybridAgent
-from environment import TutorialEnvironment
+from collections import deque
+from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+from rl_agent import QLearningAgent, ThompsonSamplingAgent, HybridAgent, State
+from environment import TutorialEnvironment, VectorTutorialEnv, _step_kernel, HAVE_NUMBA
+
+if HAVE_NUMBA:
+    import numba
+
+def _qlearning_episode_kernel(q_table, lr, gamma, epsilon,
+                              base_prob, learn_rate, fatigue_rate,
+                              u_env, u_eps, u_act, u_tie, actions_out):
+    """
+    Run one full 20-step Q-learning episode as a single numeric loop
+
+    Fuses action selection, the environment step kernel, and the
+    Q-update so the whole episode executes without interpreter dispatch
+    when compiled. Uniform draws are passed in as pre-filled arrays.
+    Returns (episode_reward, successes, final_performance).
+    """
+    performance = 0.5
+    streak = 0
+    fatigue = 0.0
+    difficulty = 1
+    episode_reward = 0.0
+    successes = 0
+
+    for t in range(20):
+        p = int(performance * 10)
+        s = min(streak, 5)
+
+        # Epsilon-greedy selection with random tie-breaking
+        if u_eps[t] < epsilon:
+            action = int(u_act[t] * 4)
+        else:
+            best_q = q_table[p, s, difficulty, 0]
+            for a in range(1, 4):
+                if q_table[p, s, difficulty, a] > best_q:
+                    best_q = q_table[p, s, difficulty, a]
+            n_best = 0
+            for a in range(4):
+                if q_table[p, s, difficulty, a] == best_q:
+                    n_best += 1
+            pick = int(u_tie[t] * n_best)
+            action = 0
+            for a in range(4):
+                if q_table[p, s, difficulty, a] == best_q:
+                    if pick == 0:
+                        action = a
+                        break
+                    pick -= 1
+
+        # Environment transition via the shared step kernel
+        new_perf, new_streak, new_fatigue, reward, success, _prob = _step_kernel(
+            performance, streak, fatigue, action, u_env[t],
+            base_prob, learn_rate, fatigue_rate)
+
+        done = t == 19
+
+        # Q-learning update
+        current_q = q_table[p, s, difficulty, action]
+        if done:
+            target = reward
+        else:
+            np_i = int(new_perf * 10)
+            ns = min(new_streak, 5)
+            next_max = q_table[np_i, ns, action, 0]
+            for a in range(1, 4):
+                if q_table[np_i, ns, action, a] > next_max:
+                    next_max = q_table[np_i, ns, action, a]
+            target = reward + gamma * next_max
+        q_table[p, s, difficulty, action] += lr * (target - current_q)
+
+        performance = new_perf
+        streak = new_streak
+        fatigue = new_fatigue
+        difficulty = action
+        episode_reward += reward
+        successes += success
+        actions_out[t] = action
+
+    return episode_reward, successes, performance
+
+if HAVE_NUMBA:
+    _qlearning_episode_kernel = numba.njit(cache=True)(_qlearning_episode_kernel)
+
+def _agent_q_table(agent):
+    """Return the dense Q-table of an agent, or None if it has none"""
+    if isinstance(agent, HybridAgent):
+        return agent.q_agent.q_table
+    if isinstance(agent, QLearningAgent):
+        return agent.q_table
+    return None
+
+def _set_agent_q_table(agent, q_table: np.ndarray):
+    """Point an agent's dense Q-table at the given array"""
+    if isinstance(agent, HybridAgent):
+        agent.q_agent.q_table = q_table
+    elif isinstance(agent, QLearningAgent):
+        agent.q_table = q_table
+
+def _run_episode_slice(agent_type: str, env_type: str, n_episodes: int, seed: int):
+    """Worker entry point: run an independent slice of episodes in a subprocess"""
+    # Every env/agent draw comes from the runner's per-object
+    # generators, so the seed alone controls the whole slice
+    runner = ExperimentRunner(agent_type, env_type, seed=seed)
+    runner.run_experiment(n_episodes, verbose=False)
+    q_table = _agent_q_table(runner.agent)
+    return runner.metrics, q_table
+
+def _run_episode_slice_shared(agent_type: str, env_type: str, n_episodes: int,
+                              seed: int, shm_name: str, q_shape: tuple):
+    """
+    Worker entry point training against a shared-memory Q-table
+
+    Workers attach to the table by name and write updates in place
+    (Hogwild-style, lock-free), so no Q-table is pickled back.
+    """
+    runner = ExperimentRunner(agent_type, env_type, seed=seed)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        shared_q = np.ndarray(q_shape, dtype=np.float32, buffer=shm.buf)
+        _set_agent_q_table(runner.agent, shared_q)
+        runner.run_experiment(n_episodes, verbose=False)
+        return runner.metrics, None
+    finally:
+        shm.close()
 
 class ExperimentRunner:
     """Manages experiments and collects metrics"""
     
-    def __init__(self, agent_type: str = "hybrid", env_type: str = "average"):
+    def __init__(self, agent_type: str = "hybrid", env_type: str = "average",
+                 seed: Optional[int] = None):
         """
         Initialize experiment runner
-        
+
         Args:
             agent_type: One of "qlearning", "thompson", or "hybrid"
             env_type: One of "fast", "average", or "slow"
+            seed: Optional seed controlling the env, agent, and runner
+                generators for reproducible runs
         """
         self.agent_type = agent_type
-        self.env = TutorialEnvironment(env_type)
-        
+        self.env_type = env_type
+        # Fan one seed out to independent child seeds so each generator
+        # gets its own stream
+        env_seed, agent_seed, runner_seed = (
+            int(s) for s in np.random.SeedSequence(seed).generate_state(3))
+        self.env = TutorialEnvironment(env_type, seed=env_seed)
+
         # Initialize agent based on type
         if agent_type == "qlearning":
-            self.agent = QLearningAgent()
+            self.agent = QLearningAgent(seed=agent_seed)
         elif agent_type == "thompson":
-            self.agent = ThompsonSamplingAgent()
+            self.agent = ThompsonSamplingAgent(seed=agent_seed)
         else:  # hybrid
-            self.agent = HybridAgent()
+            self.agent = HybridAgent(seed=agent_seed)
         
         # Initialize metrics storage
         self.metrics = {
@@ -40,46 +175,213 @@ class ExperimentRunner:
             "convergence_episode": None,
             "q_table_sizes": []
         }
-        
+
+        # Running accumulators so convergence checks and the final report
+        # never rescan the full reward history
+        self._reward_sum = 0.0
+        self._reward_sumsq = 0.0
+        self._reward_count = 0
+        self._reward_min = math.inf
+        self._reward_max = -math.inf
+        self._first_rewards = []            # first 10, for the improvement metric
+        self._recent = deque(maxlen=20)     # last two convergence windows
+
+        # Plain Q-learning episodes can run entirely inside the compiled kernel
+        self._use_compiled = HAVE_NUMBA and agent_type == "qlearning"
+        self._rng = np.random.default_rng(runner_seed)
+        self._ep_idx = 0  # write position when metrics are preallocated arrays
+
+    def _preallocate_metrics(self, n_episodes: int):
+        """Switch metric storage to preallocated arrays for a known episode count"""
+        self.metrics["episode_rewards"] = np.empty(n_episodes, dtype=np.float32)
+        self.metrics["success_rates"] = np.empty(n_episodes, dtype=np.float32)
+        self.metrics["performance_history"] = np.empty(n_episodes, dtype=np.float32)
+        self.metrics["q_table_sizes"] = np.empty(n_episodes, dtype=np.int64)
+        self.metrics["difficulty_history"] = np.empty((n_episodes, 20), dtype=np.int8)
+        self._ep_idx = 0
+
+    def _store_episode_metrics(self, episode_num: int, success_rate: float,
+                               performance: float, actions: np.ndarray):
+        """Record per-episode metrics by index when preallocated, else append"""
+        metrics = self.metrics
+        if isinstance(metrics["success_rates"], np.ndarray):
+            metrics["success_rates"][episode_num] = success_rate
+            metrics["performance_history"][episode_num] = performance
+            metrics["q_table_sizes"][episode_num] = self.agent.get_q_table_size()
+            metrics["difficulty_history"][episode_num, :len(actions)] = actions
+        else:
+            metrics["success_rates"].append(success_rate)
+            metrics["performance_history"].append(performance)
+            metrics["difficulty_history"].append(np.asarray(actions, dtype=np.int8))
+            metrics["q_table_sizes"].append(self.agent.get_q_table_size())
+
+    def _record_reward(self, reward: float):
+        """Store an episode reward and update the running accumulators"""
+        rewards = self.metrics["episode_rewards"]
+        if isinstance(rewards, np.ndarray):
+            rewards[self._ep_idx] = reward
+            self._ep_idx += 1
+        else:
+            rewards.append(reward)
+        self._reward_sum += reward
+        self._reward_sumsq += reward * reward
+        self._reward_count += 1
+        self._reward_min = min(self._reward_min, reward)
+        self._reward_max = max(self._reward_max, reward)
+        if len(self._first_rewards) < 10:
+            self._first_rewards.append(reward)
+        self._recent.append(reward)
+
     def run_episode(self, episode_num: int) -> float:
         """Run a single episode"""
+        if self._use_compiled:
+            return self._run_episode_compiled(episode_num)
+
         state = self.env.reset()
         episode_reward = 0
         successes = 0
-        actions_taken = []
-        
+        actions_buf = np.empty(20, dtype=np.int8)
+        n_steps = 0
+
         while True:
             # Select action
             action = self.agent.select_action(state)
-            
+
+            # env.step mutates its State object in place, so snapshot the
+            # pre-transition state here; without the copy the Q-update
+            # would key both sides of the transition off the *post*-step
+            # state. This matches the compiled kernel's semantics.
+            prev_state = replace(state)
+
             # Execute action in environment
             next_state, reward, done, info = self.env.step(action)
-            
+
             # Update agent
-            self.agent.update(state, action, reward, next_state, done)
-            
+            self.agent.update(prev_state, action, reward, next_state, done)
+
             # Track metrics
             episode_reward += reward
             if info["success"]:
                 successes += 1
-            actions_taken.append(action)
-            self.metrics["action_distribution"][action] += 1
-            
+            actions_buf[n_steps] = action
+            n_steps += 1
+
             # Move to next state
             state = next_state
-            
+
             if done:
                 break
-        
-        # Calculate episode metrics
-        success_rate = successes / len(actions_taken) if actions_taken else 0
-        self.metrics["success_rates"].append(success_rate)
-        self.metrics["performance_history"].append(state.performance)
-        self.metrics["difficulty_history"].append(actions_taken)
-        self.metrics["q_table_sizes"].append(self.agent.get_q_table_size())
-        
+
+        # Calculate episode metrics; one bincount replaces 20 scalar
+        # ndarray writes and list appends
+        actions_taken = actions_buf[:n_steps]
+        self.metrics["action_distribution"] += np.bincount(actions_taken, minlength=4)
+        success_rate = successes / n_steps if n_steps else 0
+        self._store_episode_metrics(episode_num, success_rate, state.performance,
+                                    actions_taken)
+
         return episode_reward
-    
+
+    def _run_episode_compiled(self, episode_num: int) -> float:
+        """Run a single episode through the fused numba kernel"""
+        u = self._rng.random((4, 20))
+        actions_buf = np.empty(20, dtype=np.int8)
+
+        episode_reward, successes, final_performance = _qlearning_episode_kernel(
+            self.agent.q_table,
+            self.agent.learning_rate, self.agent.discount_factor, self.agent.epsilon,
+            self.env.profile["base_prob"], self.env.profile["learn_rate"],
+            self.env.profile["fatigue_rate"],
+            u[0], u[1], u[2], u[3], actions_buf)
+
+        self.metrics["action_distribution"] += np.bincount(actions_buf, minlength=4)
+        self._store_episode_metrics(episode_num, successes / 20, final_performance,
+                                    actions_buf)
+
+        return float(episode_reward)
+
+    def run_steps(self, num_steps: int, n_envs: int = 8) -> None:
+        """
+        Roll out n_envs environments in lockstep for num_steps steps
+
+        Collects n_envs transitions per Python dispatch instead of one,
+        amortizing the per-call overhead of env.step and agent updates.
+        Episode metrics are recorded whenever a lane finishes (autoreset).
+        """
+        venv = VectorTutorialEnv(n_envs, self.env_type,
+                                 seed=int(self._rng.integers(2**31 - 1)))
+        perf, streak, diff = venv.states()
+
+        episode_rewards = np.zeros(n_envs)
+        episode_successes = np.zeros(n_envs, dtype=np.int64)
+
+        for _ in range(num_steps):
+            # Select actions for all lanes (batched when the agent supports it)
+            if hasattr(self.agent, "select_action_batch"):
+                actions = self.agent.select_action_batch(perf, streak, diff)
+            else:
+                actions = np.array([
+                    self.agent.select_action(State(perf[i], streak[i], 0, diff[i]))
+                    for i in range(n_envs)])
+
+            (next_perf, next_streak, next_diff), rewards, dones, info = venv.step(actions)
+
+            # Update agent on all transitions
+            if hasattr(self.agent, "update_batch"):
+                self.agent.update_batch(perf, streak, diff, actions, rewards,
+                                        next_perf, next_streak, next_diff, dones)
+            else:
+                for i in range(n_envs):
+                    self.agent.update(
+                        State(perf[i], streak[i], 0, diff[i]), actions[i], rewards[i],
+                        State(next_perf[i], next_streak[i], 0, next_diff[i]), dones[i])
+
+            # Track metrics
+            episode_rewards += rewards
+            episode_successes += info["success"]
+            self.metrics["action_distribution"] += np.bincount(actions, minlength=4)
+
+            # Close out finished lanes
+            if dones.any():
+                for i in np.flatnonzero(dones):
+                    self._record_reward(float(episode_rewards[i]))
+                    self.metrics["success_rates"].append(
+                        episode_successes[i] / venv.episode_length)
+                    self.metrics["performance_history"].append(info["final_performance"][i])
+                    self.metrics["q_table_sizes"].append(self.agent.get_q_table_size())
+                episode_rewards[dones] = 0
+                episode_successes[dones] = 0
+
+            perf, streak, diff = next_perf.copy(), next_streak.copy(), next_diff.copy()
+
+    def run_experiment_vectorized(self, n_episodes: int = 100, n_envs: int = 8,
+                                  verbose: bool = True) -> Dict:
+        """
+        Run full experiment using the vectorized environment
+
+        Args:
+            n_episodes: Total number of episodes to collect (across all lanes)
+            n_envs: Number of environments stepped in lockstep
+            verbose: Whether to print progress updates
+        """
+        start_time = time.time()
+        episode_length = 20
+
+        # Each batch of n_envs lanes finishes one episode per episode_length steps
+        num_steps = ((n_episodes + n_envs - 1) // n_envs) * episode_length
+        self.run_steps(num_steps, n_envs)
+
+        if self.metrics["convergence_episode"] is None and self._check_convergence():
+            self.metrics["convergence_episode"] = len(self.metrics["episode_rewards"])
+
+        if verbose:
+            self._print_progress(len(self.metrics["episode_rewards"]),
+                                 len(self.metrics["episode_rewards"]))
+
+        execution_time = time.time() - start_time
+
+        return self._generate_report(execution_time)
+
     def run_experiment(self, n_episodes: int = 100, verbose: bool = True) -> Dict:
         """
         Run full experiment
@@ -89,16 +391,23 @@ class ExperimentRunner:
             verbose: Whether to print progress updates
         """
         start_time = time.time()
-        
+
+        # Episode count is known up front, so store metrics in
+        # preallocated contiguous arrays instead of growing lists
+        self._preallocate_metrics(n_episodes)
+
         for episode in range(n_episodes):
             # Run episode
             reward = self.run_episode(episode)
-            self.metrics["episode_rewards"].append(reward)
+            self._record_reward(reward)
             
-            # Check for convergence
-            if self._check_convergence() and self.metrics["convergence_episode"] is None:
+            # Check for convergence once per window, on the same cadence
+            # as the progress updates
+            if ((episode + 1) % 10 == 0
+                    and self.metrics["convergence_episode"] is None
+                    and self._check_convergence()):
                 self.metrics["convergence_episode"] = episode
-            
+
             # Progress updates
             if verbose and (episode + 1) % 10 == 0:
                 self._print_progress(episode + 1, n_episodes)
@@ -108,10 +417,95 @@ class ExperimentRunner:
         
         return self._generate_report(execution_time)
     
+    def run_experiment_parallel(self, n_episodes: int = 100, n_workers: int = 4,
+                                share_q_table: bool = False,
+                                verbose: bool = True) -> Dict:
+        """
+        Run episodes across worker processes and merge the results
+
+        Episodes are embarrassingly parallel, so each worker trains on
+        its share of episodes with its own seed and metrics are
+        concatenated afterward. By default each worker gets an
+        independent agent copy and dense Q-tables are merged by
+        element-wise mean; with share_q_table=True the Q-table is backed
+        by multiprocessing shared memory instead, so workers update one
+        table in place and nothing is pickled back.
+
+        Args:
+            n_episodes: Total number of episodes across all workers
+            n_workers: Number of worker processes
+            share_q_table: Back the Q-table with shared memory
+            verbose: Whether to print a summary line at the end
+        """
+        start_time = time.time()
+
+        # Distribute episodes as evenly as possible
+        base, extra = divmod(n_episodes, n_workers)
+        counts = [base + (1 if i < extra else 0) for i in range(n_workers)]
+        seeds = self._rng.integers(0, 2**31 - 1, size=n_workers)
+
+        own_q = _agent_q_table(self.agent)
+        shm = None
+        if share_q_table and own_q is not None:
+            shm = shared_memory.SharedMemory(create=True, size=own_q.nbytes)
+            shared_q = np.ndarray(own_q.shape, dtype=np.float32, buffer=shm.buf)
+            shared_q[...] = own_q
+
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                if shm is not None:
+                    futures = [
+                        pool.submit(_run_episode_slice_shared, self.agent_type,
+                                    self.env_type, count, int(seed),
+                                    shm.name, own_q.shape)
+                        for count, seed in zip(counts, seeds) if count > 0]
+                else:
+                    futures = [
+                        pool.submit(_run_episode_slice, self.agent_type,
+                                    self.env_type, count, int(seed))
+                        for count, seed in zip(counts, seeds) if count > 0]
+                results = [f.result() for f in futures]
+
+            if shm is not None:
+                # Workers updated the shared table in place; copy it back
+                own_q[...] = shared_q
+            else:
+                # Merge worker Q-tables into this runner's agent by element-wise mean
+                q_tables = [q for _, q in results if q is not None]
+                if q_tables and own_q is not None:
+                    own_q[...] = np.mean(q_tables, axis=0)
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+        # Concatenate worker metrics
+        for worker_metrics, _ in results:
+            for reward in worker_metrics["episode_rewards"]:
+                self._record_reward(reward)
+            self.metrics["success_rates"].extend(worker_metrics["success_rates"])
+            self.metrics["performance_history"].extend(worker_metrics["performance_history"])
+            self.metrics["difficulty_history"].extend(worker_metrics["difficulty_history"])
+            self.metrics["q_table_sizes"].extend(worker_metrics["q_table_sizes"])
+            self.metrics["action_distribution"] += worker_metrics["action_distribution"]
+
+        if self.metrics["convergence_episode"] is None and self._check_convergence():
+            self.metrics["convergence_episode"] = len(self.metrics["episode_rewards"])
+
+        execution_time = time.time() - start_time
+
+        if verbose:
+            print(f"Ran {len(self.metrics['episode_rewards'])} episodes "
+                  f"across {len(results)} workers in {execution_time:.2f}s")
+
+        return self._generate_report(execution_time)
+
     def _print_progress(self, current_episode: int, total_episodes: int):
         """Print progress update"""
-        avg_reward = np.mean(self.metrics["episode_rewards"][-10:])
-        avg_success = np.mean(self.metrics["success_rates"][-10:])
+        # Slice up to the current episode so preallocated tails are ignored
+        rewards = self.metrics["episode_rewards"][:current_episode]
+        avg_reward = np.mean(rewards[-10:])
+        avg_success = np.mean(self.metrics["success_rates"][:current_episode][-10:])
         progress = current_episode / total_episodes
         
         bar_length = 30
@@ -125,44 +519,49 @@ class ExperimentRunner:
     
     def _check_convergence(self, window: int = 10, threshold: float = 0.5) -> bool:
         """Check if learning has converged"""
-        if len(self.metrics["episode_rewards"]) < window * 2:
+        if len(self._recent) < window * 2:
             return False
-        
-        recent = self.metrics["episode_rewards"][-window:]
-        previous = self.metrics["episode_rewards"][-window*2:-window]
-        
-        recent_mean = np.mean(recent)
-        previous_mean = np.mean(previous)
-        
+
+        # The deque holds exactly the last two windows; plain scalar sums
+        # avoid a list->ndarray conversion every episode
+        recent = list(self._recent)
+        previous_mean = sum(recent[:window]) / window
+        recent_mean = sum(recent[window:]) / window
+
         return abs(recent_mean - previous_mean) < threshold
     
     def _generate_report(self, execution_time: float) -> Dict:
         """Generate comprehensive experiment report"""
-        rewards = self.metrics["episode_rewards"]
         success_rates = self.metrics["success_rates"]
-        
+
+        # Reward statistics come straight from the running accumulators
+        n = self._reward_count
+        avg_reward = self._reward_sum / n
+        std_reward = math.sqrt(max(0.0, self._reward_sumsq / n - avg_reward ** 2))
+        final_window = list(self._recent)[-10:]
+
         report = {
             "agent_type": self.agent_type,
-            "total_episodes": len(rewards),
+            "total_episodes": n,
             "execution_time": execution_time,
-            "total_reward": sum(rewards),
-            "avg_reward": np.mean(rewards),
-            "std_reward": np.std(rewards),
-            "max_reward": max(rewards),
-            "min_reward": min(rewards),
-            "final_10_avg_reward": np.mean(rewards[-10:]) if len(rewards) >= 10 else np.mean(rewards),
+            "total_reward": self._reward_sum,
+            "avg_reward": avg_reward,
+            "std_reward": std_reward,
+            "max_reward": self._reward_max,
+            "min_reward": self._reward_min,
+            "final_10_avg_reward": sum(final_window) / len(final_window),
             "final_success_rate": np.mean(success_rates[-10:]) if len(success_rates) >= 10 else np.mean(success_rates),
             "overall_success_rate": np.mean(success_rates),
             "convergence_episode": self.metrics["convergence_episode"],
             "action_distribution": self.metrics["action_distribution"].tolist(),
-            "final_performance": self.metrics["performance_history"][-1] if self.metrics["performance_history"] else 0,
-            "final_q_table_size": self.metrics["q_table_sizes"][-1] if self.metrics["q_table_sizes"] else 0
+            "final_performance": self.metrics["performance_history"][-1] if len(self.metrics["performance_history"]) else 0,
+            "final_q_table_size": self.metrics["q_table_sizes"][-1] if len(self.metrics["q_table_sizes"]) else 0
         }
         
         # Calculate improvement
-        if len(rewards) >= 20:
-            initial_avg = np.mean(rewards[:10])
-            final_avg = np.mean(rewards[-10:])
+        if n >= 20:
+            initial_avg = sum(self._first_rewards) / len(self._first_rewards)
+            final_avg = report["final_10_avg_reward"]
             report["improvement"] = ((final_avg - initial_avg) / abs(initial_avg)) * 100 if initial_avg != 0 else 0
         else:
             report["improvement"] = 0
@@ -3,81 +3,137 @@ Reinforcement Learning Agents Implementation
 """
 
 import numpy as np
-from collections import defaultdict
-from typing import Dict, Optional
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 
+try:
+    # Optional compiled fast path; build with `python setup.py build_ext --inplace`
+    from rl_agent_cy import QLearningAgentCy
+except ImportError:
+    QLearningAgentCy = None
+
+@dataclass(slots=True)
 class State:
     """Represents the state of a learner"""
-    def __init__(self, performance=0.5, streak=0, questions_answered=0, difficulty=1):
-        self.performance = performance
-        self.streak = streak
-        self.questions_answered = questions_answered
-        self.difficulty = difficulty
-    
-    def to_key(self) -> str:
-        """Convert state to hashable key for Q-table"""
+    performance: float = 0.5
+    streak: int = 0
+    questions_answered: int = 0
+    difficulty: int = 1
+
+    def to_idx(self) -> Tuple[int, int, int]:
+        """Convert state to integer indices into the dense Q-table"""
         perf_bucket = int(self.performance * 10)
         streak_bucket = min(self.streak, 5)
-        return f"{perf_bucket}_{streak_bucket}_{self.difficulty}"
+        return perf_bucket, streak_bucket, self.difficulty
 
 class QLearningAgent:
     """Q-Learning implementation"""
     
     def __init__(self, action_space: int = 4, learning_rate: float = 0.1,
-                 discount_factor: float = 0.95, epsilon: float = 0.2):
+                 discount_factor: float = 0.95, epsilon: float = 0.2,
+                 seed: Optional[int] = None):
         self.action_space = action_space
         self.learning_rate = learning_rate
         self.discount_factor = discount_factor
         self.epsilon = epsilon
-        self.q_table = defaultdict(lambda: np.zeros(action_space))
-        
+        # Dense table indexed by (perf_bucket, streak_bucket, difficulty, action);
+        # small enough (~4 KB) to stay cache-resident, no hashing or per-state allocs
+        self.q_table = np.zeros((11, 6, 4, action_space), dtype=np.float32)
+        # Pre-drawn uniforms, refilled in episode-sized batches
+        self._rng = np.random.default_rng(seed)
+        self._u = self._rng.random(20)
+        self._u_i = 0
+
+    def _next_u(self) -> float:
+        """Return the next pre-drawn uniform, refilling the buffer as needed"""
+        if self._u_i >= self._u.size:
+            self._u = self._rng.random(20)
+            self._u_i = 0
+        u = self._u[self._u_i]
+        self._u_i += 1
+        return u
+
     def select_action(self, state: State) -> int:
         """Epsilon-greedy action selection"""
-        if np.random.random() < self.epsilon:
-            return np.random.randint(self.action_space)
-        
-        state_key = state.to_key()
-        q_values = self.q_table[state_key]
-        
+        if self._next_u() < self.epsilon:
+            return int(self._next_u() * self.action_space)
+
+        q_values = self.q_table[state.to_idx()]
+
         # Handle ties randomly
         max_q = np.max(q_values)
         best_actions = np.where(q_values == max_q)[0]
-        return np.random.choice(best_actions)
-    
-    def update(self, state: State, action: int, reward: float, 
+        return best_actions[int(self._next_u() * best_actions.size)]
+
+    def select_action_batch(self, performance: np.ndarray, streak: np.ndarray,
+                            difficulty: np.ndarray) -> np.ndarray:
+        """Epsilon-greedy selection for a batch of states in one gather"""
+        p = (np.asarray(performance) * 10).astype(np.int64)
+        s = np.minimum(streak, 5)
+        n = p.size
+
+        # Tiny jitter breaks ties randomly without a per-state np.where/choice
+        q_values = self.q_table[p, s, difficulty] + 1e-9 * self._rng.random((n, self.action_space))
+        greedy = np.argmax(q_values, axis=1)
+
+        explore = self._rng.random(n) < self.epsilon
+        return np.where(explore, self._rng.integers(0, self.action_space, n), greedy)
+
+    def update_batch(self, performance, streak, difficulty, actions, rewards,
+                     next_performance, next_streak, next_difficulty, dones):
+        """Q-Learning update over a batch of transitions (gather/scatter)"""
+        p = (np.asarray(performance) * 10).astype(np.int64)
+        s = np.minimum(streak, 5)
+        np_ = (np.asarray(next_performance) * 10).astype(np.int64)
+        ns = np.minimum(next_streak, 5)
+
+        next_max = self.q_table[np_, ns, next_difficulty].max(axis=1)
+        targets = rewards + self.discount_factor * next_max * ~np.asarray(dones)
+        current = self.q_table[p, s, difficulty, actions]
+
+        np.add.at(self.q_table, (p, s, difficulty, actions),
+                  (self.learning_rate * (targets - current)).astype(np.float32))
+
+    def update(self, state: State, action: int, reward: float,
                next_state: State, done: bool):
         """Q-Learning update rule"""
-        state_key = state.to_key()
-        next_state_key = next_state.to_key()
-        
-        current_q = self.q_table[state_key][action]
-        
+        idx = state.to_idx()
+        current_q = self.q_table[idx][action]
+
         if done:
             target = reward
         else:
-            target = reward + self.discount_factor * np.max(self.q_table[next_state_key])
-        
+            target = reward + self.discount_factor * np.max(self.q_table[next_state.to_idx()])
+
         # Q-learning update
-        self.q_table[state_key][action] += self.learning_rate * (target - current_q)
-    
+        self.q_table[idx + (action,)] += self.learning_rate * (target - current_q)
+
     def get_q_table_size(self) -> int:
-        """Return the number of states in Q-table"""
-        return len(self.q_table)
+        """Return the number of visited states in the Q-table"""
+        return int(np.count_nonzero(self.q_table.any(axis=-1)))
 
 class ThompsonSamplingAgent:
     """Thompson Sampling for exploration"""
     
-    def __init__(self, action_space: int = 4):
+    def __init__(self, action_space: int = 4, seed: Optional[int] = None):
         self.action_space = action_space
         self.alpha = np.ones(action_space)  # Success counts + 1
         self.beta = np.ones(action_space)   # Failure counts + 1
-        
+        self._rng = np.random.default_rng(seed)
+
     def select_action(self, state: State = None) -> int:
         """Sample from Beta distributions"""
-        samples = np.random.beta(self.alpha, self.beta)
+        samples = self._rng.beta(self.alpha, self.beta)
         return np.argmax(samples)
-    
-    def update(self, state: State, action: int, reward: float, 
+
+    def select_action_batch(self, performance: np.ndarray, streak: np.ndarray,
+                            difficulty: np.ndarray) -> np.ndarray:
+        """Sample from Beta distributions for a batch of states in one draw"""
+        n = np.asarray(performance).size
+        samples = self._rng.beta(self.alpha, self.beta, size=(n, self.action_space))
+        return samples.argmax(axis=1)
+
+    def update(self, state: State, action: int, reward: float,
                next_state: State, done: bool):
         """Update Beta distribution parameters"""
         # Update based on reward
@@ -85,6 +141,13 @@ class ThompsonSamplingAgent:
             self.alpha[action] += 1
         else:
             self.beta[action] += 1
+
+    def update_batch(self, performance, streak, difficulty, actions, rewards,
+                     next_performance, next_streak, next_difficulty, dones):
+        """Update Beta parameters over a batch of transitions"""
+        positive = np.asarray(rewards) > 0
+        np.add.at(self.alpha, np.asarray(actions)[positive], 1)
+        np.add.at(self.beta, np.asarray(actions)[~positive], 1)
     
     def get_q_table_size(self) -> int:
         """Return 0 as Thompson doesn't use Q-table"""
@@ -93,26 +156,46 @@ class ThompsonSamplingAgent:
 class HybridAgent:
     """Combines Q-Learning with Thompson Sampling"""
     
-    def __init__(self, action_space: int = 4, exploration_rate: float = 0.3):
-        self.q_agent = QLearningAgent(action_space, epsilon=0)  # No epsilon for Q-agent
-        self.thompson_agent = ThompsonSamplingAgent(action_space)
+    def __init__(self, action_space: int = 4, exploration_rate: float = 0.3,
+                 seed: Optional[int] = None):
+        # Independent child seeds so the sub-agents and the exploration
+        # gate don't share one stream
+        q_seed, t_seed, gate_seed = (
+            int(s) for s in np.random.SeedSequence(seed).generate_state(3))
+        self.q_agent = QLearningAgent(action_space, epsilon=0, seed=q_seed)  # No epsilon for Q-agent
+        self.thompson_agent = ThompsonSamplingAgent(action_space, seed=t_seed)
         self.exploration_rate = exploration_rate
         self.action_space = action_space
-        
+        self._rng = np.random.default_rng(gate_seed)
+
     def select_action(self, state: State) -> int:
         """Hybrid action selection"""
-        if np.random.random() < self.exploration_rate:
+        if self._rng.random() < self.exploration_rate:
             # Use Thompson Sampling for exploration
             return self.thompson_agent.select_action(state)
         else:
             # Use Q-learning for exploitation
             return self.q_agent.select_action(state)
-    
-    def update(self, state: State, action: int, reward: float, 
+
+    def select_action_batch(self, performance: np.ndarray, streak: np.ndarray,
+                            difficulty: np.ndarray) -> np.ndarray:
+        """Hybrid selection for a batch of states"""
+        explore = self._rng.random(np.asarray(performance).size) < self.exploration_rate
+        return np.where(
+            explore,
+            self.thompson_agent.select_action_batch(performance, streak, difficulty),
+            self.q_agent.select_action_batch(performance, streak, difficulty))
+
+    def update(self, state: State, action: int, reward: float,
                next_state: State, done: bool):
         """Update both agents"""
         self.q_agent.update(state, action, reward, next_state, done)
         self.thompson_agent.update(state, action, reward, next_state, done)
+
+    def update_batch(self, *transition):
+        """Update both agents on a batch of transitions"""
+        self.q_agent.update_batch(*transition)
+        self.thompson_agent.update_batch(*transition)
     
     def get_q_table_size(self) -> int:
         """Return Q-table size from Q-agent"""
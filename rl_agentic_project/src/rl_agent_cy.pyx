@@ -0,0 +1,94 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Cython-compiled Q-Learning agent
+
+Optional fast path for the Q-learning hot loop: the Q-table lives in a
+typed float32 memoryview and select_action/update run without any
+interpreter dispatch. Build in place with:
+
+    python setup.py build_ext --inplace
+
+rl_agent.py falls back to the pure-Python QLearningAgent when this
+extension has not been built.
+"""
+
+import numpy as np
+from libc.stdlib cimport rand, RAND_MAX
+
+
+cdef class QLearningAgentCy:
+    """Q-Learning implementation with a typed, cache-resident Q-table"""
+
+    cdef object _q_table_arr
+    cdef float[:, :, :, ::1] q_table
+    cdef public int action_space
+    cdef public float learning_rate
+    cdef public float discount_factor
+    cdef public float epsilon
+
+    def __init__(self, int action_space=4, float learning_rate=0.1,
+                 float discount_factor=0.95, float epsilon=0.2):
+        self.action_space = action_space
+        self.learning_rate = learning_rate
+        self.discount_factor = discount_factor
+        self.epsilon = epsilon
+        self._q_table_arr = np.zeros((11, 6, 4, action_space), dtype=np.float32)
+        self.q_table = self._q_table_arr
+
+    property q_table_array:
+        """The Q-table as a numpy array (shared storage with the memoryview)"""
+        def __get__(self):
+            return self._q_table_arr
+
+    cpdef int select_action(self, int perf_bucket, int streak_bucket, int difficulty):
+        """Epsilon-greedy action selection on bucketed state indices"""
+        cdef double u = rand() / (RAND_MAX + 1.0)
+        cdef int a, best, n_best, pick
+        cdef float best_q
+
+        if u < self.epsilon:
+            return rand() % self.action_space
+
+        best_q = self.q_table[perf_bucket, streak_bucket, difficulty, 0]
+        for a in range(1, self.action_space):
+            if self.q_table[perf_bucket, streak_bucket, difficulty, a] > best_q:
+                best_q = self.q_table[perf_bucket, streak_bucket, difficulty, a]
+
+        # Handle ties randomly
+        n_best = 0
+        for a in range(self.action_space):
+            if self.q_table[perf_bucket, streak_bucket, difficulty, a] == best_q:
+                n_best += 1
+        pick = rand() % n_best
+        best = 0
+        for a in range(self.action_space):
+            if self.q_table[perf_bucket, streak_bucket, difficulty, a] == best_q:
+                if pick == 0:
+                    best = a
+                    break
+                pick -= 1
+        return best
+
+    cpdef void update(self, int perf_bucket, int streak_bucket, int difficulty,
+                      int action, float reward, int next_perf_bucket,
+                      int next_streak_bucket, int next_difficulty, bint done):
+        """Q-Learning update rule on bucketed state indices"""
+        cdef float current_q = self.q_table[perf_bucket, streak_bucket, difficulty, action]
+        cdef float next_max, target
+        cdef int a
+
+        if done:
+            target = reward
+        else:
+            next_max = self.q_table[next_perf_bucket, next_streak_bucket, next_difficulty, 0]
+            for a in range(1, self.action_space):
+                if self.q_table[next_perf_bucket, next_streak_bucket, next_difficulty, a] > next_max:
+                    next_max = self.q_table[next_perf_bucket, next_streak_bucket, next_difficulty, a]
+            target = reward + self.discount_factor * next_max
+
+        self.q_table[perf_bucket, streak_bucket, difficulty, action] += \
+            self.learning_rate * (target - current_q)
+
+    def get_q_table_size(self):
+        """Return the number of visited states in the Q-table"""
+        return int(np.count_nonzero(self._q_table_arr.any(axis=-1)))
@@ -3,14 +3,225 @@ Visualization module for experiment results
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+from datetime import datetime
+from functools import cached_property, lru_cache
 from typing import Dict, Optional
 import os
 
-# Set style
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
+try:
+    import numba
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+# The plotting stack is imported lazily by _ensure_style, so report-only
+# callers (generate_html_report) never pay the matplotlib/seaborn import
+# and rcparam cost
+plt = None
+_styled = False
+
+def _ensure_style():
+    """Import matplotlib/seaborn and apply styling once, on first plot"""
+    global _styled, plt, LineCollection, to_rgba, Line2D
+    if _styled:
+        return
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from matplotlib.collections import LineCollection
+    from matplotlib.colors import to_rgba
+    from matplotlib.lines import Line2D
+
+    # Set style
+    plt.style.use('seaborn-v0_8-darkgrid')
+    sns.set_palette("husl")
+    _styled = True
+
+# Action-distribution constants, hoisted so renders share one tuple
+_ACTION_LABELS = ('Easy', 'Medium', 'Hard', 'Expert')
+_ACTION_COLORS = ('#2ecc71', '#3498db', '#f39c12', '#e74c3c')
+
+# Figures reused across renders, keyed by layout; see _get_fig
+_FIG_POOL = {}
+
+def _get_fig(rows, cols, figsize, registered=False):
+    """Return a pooled (figure, axes) pair, clearing the axes for reuse
+
+    Building a grid of Axes with their transforms and spine artists
+    costs tens of milliseconds; batch dashboards render many times, so
+    each layout's figure is built once and recycled. Pass registered
+    when the figure must still be known to pyplot (the plt.show path),
+    which forces a rebuild if a previous save closed it.
+    """
+    key = (rows, cols, figsize)
+    fig, axes = _FIG_POOL.get(key, (None, None))
+    if fig is None or (registered and not plt.fignum_exists(fig.number)):
+        fig, axes = plt.subplots(rows, cols, figsize=figsize)
+        _FIG_POOL[key] = (fig, axes)
+    else:
+        for ax in axes.flat:
+            ax.cla()
+    return fig, axes
+
+def _ma_kernel(arr, window, out):
+    """Running-sum moving average written straight into out
+
+    One fused add/subtract loop with no intermediate cumsum array;
+    numba compiles it when available, otherwise _ma_cached falls back
+    to the prefix-sum path below.
+    """
+    s = 0.0
+    for i in range(window):
+        s += arr[i]
+    out[0] = s / window
+    for i in range(window, arr.size):
+        s += arr[i] - arr[i - window]
+        out[i - window + 1] = s / window
+
+if HAVE_NUMBA:
+    _ma_kernel = numba.njit(cache=True, fastmath=True)(_ma_kernel)
+
+@lru_cache(maxsize=16)
+def _ma_cached(arr_bytes: bytes, window: int) -> np.ndarray:
+    """Moving average memoized on the raw array bytes
+
+    Dashboard refreshes rebuild the Visualizer with identical metrics;
+    keying on the bytes makes repeated renders a dict lookup.
+    """
+    arr = np.frombuffer(arr_bytes, dtype=np.float32)
+    if HAVE_NUMBA:
+        out = np.empty(arr.size - window + 1, dtype=np.float32)
+        _ma_kernel(arr, window, out)
+        return out
+    # Accumulate in float64 for accuracy, hand float32 to matplotlib
+    cumulative = np.empty(arr.size + 1)
+    cumulative[0] = 0
+    np.cumsum(arr, out=cumulative[1:])
+    ma = (cumulative[window:] - cumulative[:-window]) * (1.0 / window)
+    return ma.astype(np.float32)
+
+def _median(arr: np.ndarray) -> float:
+    """Median via np.partition — O(N) selection instead of a full sort"""
+    k = arr.size // 2
+    if arr.size % 2:
+        return float(np.partition(arr, k)[k])
+    part = np.partition(arr, (k - 1, k))
+    return 0.5 * (float(part[k - 1]) + float(part[k]))
+
+@lru_cache(maxsize=16)
+def _hist_cached(arr_bytes: bytes, bins: int):
+    """Histogram counts and bin edges memoized on the raw array bytes
+
+    Bins are uniform, so digitizing is one multiply-and-truncate pass
+    plus a bincount — no searchsorted as in np.histogram.
+    """
+    arr = np.frombuffer(arr_bytes, dtype=np.float32)
+    if arr.size == 0:
+        return np.zeros(bins, dtype=np.int64), np.linspace(0.0, 1.0, bins + 1)
+    lo, hi = arr.min(), arr.max()
+    edges = np.linspace(lo, hi, bins + 1)
+    if hi == lo:
+        counts = np.zeros(bins, dtype=np.int64)
+        counts[0] = arr.size
+        return counts, edges
+    idx = np.clip(((arr - lo) * (bins / (hi - lo))).astype(np.int32), 0, bins - 1)
+    return np.bincount(idx, minlength=bins), edges
+
+# Report template interned once at module scope; generate_html_report
+# fills it with a single format_map pass
+_HTML_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>RL Experiment Report</title>
+    <style>
+        body {{
+            font-family: Arial, sans-serif;
+            margin: 40px;
+            background-color: #f5f5f5;
+        }}
+        h1 {{
+            color: #333;
+            border-bottom: 3px solid #4CAF50;
+            padding-bottom: 10px;
+        }}
+        .metrics {{
+            display: grid;
+            grid-template-columns: repeat(3, 1fr);
+            gap: 20px;
+            margin: 30px 0;
+        }}
+        .metric-card {{
+            background: white;
+            padding: 20px;
+            border-radius: 8px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }}
+        .metric-label {{
+            color: #666;
+            font-size: 14px;
+            margin-bottom: 5px;
+        }}
+        .metric-value {{
+            color: #333;
+            font-size: 24px;
+            font-weight: bold;
+        }}
+        .success {{
+            color: #4CAF50;
+        }}
+        .warning {{
+            color: #FF9800;
+        }}
+    </style>
+</head>
+<body>
+    <h1>🚀 Reinforcement Learning Experiment Report</h1>
+
+    <h2>Configuration</h2>
+    <p><strong>Algorithm:</strong> {agent_type}</p>
+    <p><strong>Episodes:</strong> {total_episodes}</p>
+    <p><strong>Execution Time:</strong> {execution_time:.2f} seconds</p>
+
+    <h2>Performance Metrics</h2>
+    <div class="metrics">
+        <div class="metric-card">
+            <div class="metric-label">Average Reward</div>
+            <div class="metric-value">{avg_reward:.2f}</div>
+        </div>
+        <div class="metric-card">
+            <div class="metric-label">Final Success Rate</div>
+            <div class="metric-value success">{final_success_rate:.1%}</div>
+        </div>
+        <div class="metric-card">
+            <div class="metric-label">Performance Improvement</div>
+            <div class="metric-value">{improvement:.1f}%</div>
+        </div>
+        <div class="metric-card">
+            <div class="metric-label">Max Reward</div>
+            <div class="metric-value">{max_reward:.2f}</div>
+        </div>
+        <div class="metric-card">
+            <div class="metric-label">Convergence</div>
+            <div class="metric-value">{convergence}</div>
+        </div>
+        <div class="metric-card">
+            <div class="metric-label">Q-Table Size</div>
+            <div class="metric-value">{final_q_table_size}</div>
+        </div>
+    </div>
+
+    <h2>Action Distribution</h2>
+    <p>Easy: {dist_easy:.0f} selections</p>
+    <p>Medium: {dist_medium:.0f} selections</p>
+    <p>Hard: {dist_hard:.0f} selections</p>
+    <p>Expert: {dist_expert:.0f} selections</p>
+
+    <p style="margin-top: 40px; color: #666; font-size: 12px;">
+        Generated: {now}
+    </p>
+</body>
+</html>
+"""
 
 class Visualizer:
     """Create visualizations for RL experiments"""
@@ -18,94 +229,232 @@ class Visualizer:
     def __init__(self, metrics: Dict):
         """Initialize with experiment metrics"""
         self.metrics = metrics
-        
+        # Cache contiguous arrays of every metric series so plot methods
+        # run vectorized C loops instead of re-traversing Python lists;
+        # float32 halves the bandwidth through the transform pipeline and
+        # plotting needs no more precision than that
+        self._rewards = np.asarray(metrics["episode_rewards"], dtype=np.float32)
+        self._success = np.asarray(metrics["success_rates"], dtype=np.float32) * 100.0
+        self._perf = np.asarray(metrics["performance_history"], dtype=np.float32) * 100.0
+        self._qsizes = np.asarray(metrics["q_table_sizes"], dtype=np.int64)
+        self._action_counts = np.asarray(metrics["action_distribution"], dtype=np.float64)
+        # Fused moving-average results keyed by window; see _ma_pair
+        self._ma_pair_cache = {}
+
+    @classmethod
+    def from_arrays(cls, episode_rewards, success_rates, performance_history,
+                    q_table_sizes, action_distribution) -> "Visualizer":
+        """Build a Visualizer straight from metric arrays
+
+        run_experiment keeps its metrics as preallocated SoA ndarrays;
+        handing those over directly lets __init__ adopt correctly-typed
+        arrays zero-copy instead of re-boxing every value through a
+        Python list.
+        """
+        return cls({
+            "episode_rewards": episode_rewards,
+            "success_rates": success_rates,
+            "performance_history": performance_history,
+            "q_table_sizes": q_table_sizes,
+            "action_distribution": action_distribution,
+        })
+
+    @classmethod
+    def from_metrics_dict(cls, metrics: Dict) -> "Visualizer":
+        """Build a Visualizer from a plain metrics dict
+
+        Missing series plot as empty instead of raising, so partial
+        metric dumps (e.g. reloaded from disk) can still be rendered;
+        each present series is copied once into the compact cached
+        arrays.
+        """
+        return cls({
+            "episode_rewards": metrics.get("episode_rewards", ()),
+            "success_rates": metrics.get("success_rates", ()),
+            "performance_history": metrics.get("performance_history", ()),
+            "q_table_sizes": metrics.get("q_table_sizes", ()),
+            "action_distribution": metrics.get("action_distribution",
+                                               (0, 0, 0, 0)),
+        })
+
+    @cached_property
+    def _rewards_mean(self) -> float:
+        """Mean episode reward, computed once per Visualizer"""
+        return float(self._rewards.mean(dtype=np.float64))
+
+    @cached_property
+    def _rewards_median(self) -> float:
+        """Median episode reward, computed once per Visualizer"""
+        return _median(self._rewards)
+
+    @cached_property
+    def _episode_idx(self) -> np.ndarray:
+        """Episode x-axis shared by all plots; slice to the series length"""
+        n_max = max(self._rewards.size, self._success.size,
+                    self._perf.size, self._qsizes.size)
+        # int32 is plenty for episode counts and halves the x-axis
+        # traffic; every plot slices this one array zero-copy
+        return np.arange(n_max, dtype=np.int32)
+
+    @staticmethod
+    def _moving_average(arr: np.ndarray, window: int) -> np.ndarray:
+        """O(N) moving average via prefix sums, memoized across renders"""
+        arr = np.asarray(arr, dtype=np.float32)
+        return _ma_cached(arr.tobytes(), window)
+
+    def _ma_pair(self, window: int):
+        """Moving averages for rewards and success rates in one fused pass
+
+        The learning-curve and success-rate plots share the episode axis
+        and window, so stacking the two series into a 2D array lets a
+        single cumsum walk memory once instead of twice.
+        """
+        cached = self._ma_pair_cache.get(window)
+        if cached is None:
+            stacked = np.stack([self._rewards, self._success])
+            cumulative = np.zeros((2, stacked.shape[1] + 1))
+            np.cumsum(stacked, axis=1, out=cumulative[:, 1:])
+            ma = ((cumulative[:, window:] - cumulative[:, :-window])
+                  * (1.0 / window)).astype(np.float32)
+            cached = self._ma_pair_cache[window] = (ma[0], ma[1])
+        return cached
+
     def create_all_plots(self, save_path: Optional[str] = None):
         """Create all visualization plots"""
-        fig, axes = plt.subplots(2, 3, figsize=(18, 10))
-        fig.suptitle('Reinforcement Learning Experiment Results', fontsize=16, fontweight='bold')
-        
-        # 1. Learning Curve
-        self.plot_learning_curve(axes[0, 0])
-        
-        # 2. Success Rate
-        self.plot_success_rate(axes[0, 1])
-        
-        # 3. Action Distribution
-        self.plot_action_distribution(axes[0, 2])
-        
-        # 4. Performance Evolution
-        self.plot_performance_evolution(axes[1, 0])
-        
-        # 5. Q-Table Growth
-        self.plot_q_table_growth(axes[1, 1])
-        
-        # 6. Reward Distribution
-        self.plot_reward_distribution(axes[1, 2])
-        
-        plt.tight_layout()
-        
         if save_path:
-            plt.savefig(save_path, dpi=100, bbox_inches='tight')
-            print(f"Plots saved to: {save_path}")
-        
-        plt.show()
+            # Pure file output never needs an interactive backend; Agg
+            # skips the window-system setup (force=False leaves an
+            # already-selected backend alone)
+            import matplotlib
+            matplotlib.use('Agg', force=False)
+        _ensure_style()
+        # Disable autolayout while the six subplots are populated so the
+        # figure gets a single layout pass at the end
+        with plt.rc_context({'figure.autolayout': False}):
+            fig, axes = _get_fig(2, 3, (18, 10), registered=save_path is None)
+            fig.suptitle('Reinforcement Learning Experiment Results', fontsize=16, fontweight='bold')
+
+            # 1. Learning Curve
+            self.plot_learning_curve(axes[0, 0])
+
+            # 2. Success Rate
+            self.plot_success_rate(axes[0, 1])
+
+            # 3. Action Distribution
+            self.plot_action_distribution(axes[0, 2])
+
+            # 4. Performance Evolution
+            self.plot_performance_evolution(axes[1, 0])
+
+            # 5. Q-Table Growth
+            self.plot_q_table_growth(axes[1, 1])
+
+            # 6. Reward Distribution
+            self.plot_reward_distribution(axes[1, 2])
+
+            # Lay out the pooled figure explicitly; plt.tight_layout()
+            # targets plt.gcf(), which is a fresh stray figure once a
+            # save has closed (deregistered) the pooled one
+            fig.tight_layout()
+
+            if save_path:
+                # draw_idle defers rendering to savefig's draw instead of
+                # forcing an extra interactive draw via show()
+                fig.canvas.draw_idle()
+                # Only Pillow's raster writers understand pil_kwargs;
+                # vector formats like .pdf/.svg reject the argument
+                save_kwargs = {}
+                ext = os.path.splitext(save_path)[1].lower()
+                if ext in ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.webp'):
+                    save_kwargs['pil_kwargs'] = {'optimize': True}
+                fig.savefig(save_path, dpi=100, bbox_inches='tight',
+                           **save_kwargs)
+                # Drop the renderer buffers immediately rather than leaving
+                # the figure registered with pyplot until interpreter exit
+                plt.close(fig)
+                print(f"Plots saved to: {save_path}")
+            else:
+                plt.show()
         
     def plot_learning_curve(self, ax):
         """Plot episode rewards with moving average"""
-        episodes = range(len(self.metrics["episode_rewards"]))
-        rewards = self.metrics["episode_rewards"]
-        
-        # Plot raw rewards
-        ax.plot(episodes, rewards, alpha=0.3, color='blue', label='Episode Reward')
-        
-        # Plot moving average
-        window = min(10, len(rewards) // 4)
-        if len(rewards) >= window:
-            moving_avg = np.convolve(rewards, np.ones(window)/window, mode='valid')
-            ax.plot(range(window-1, len(rewards)), moving_avg, 
-                   color='red', linewidth=2, label=f'{window}-Episode Average')
-        
+        _ensure_style()
+        rewards = self._rewards
+        episodes = self._episode_idx[:rewards.size]
+
+        # Raw rewards and moving average go into one LineCollection so
+        # matplotlib walks a single artist instead of two Line2D objects
+        segments = [np.column_stack([episodes, rewards])]
+        colors = [to_rgba('blue', 0.3)]
+        linewidths = [1.5]
+        handles = [Line2D([], [], color='blue', alpha=0.3, label='Episode Reward')]
+
+        window = min(10, rewards.size // 4)
+        if window > 0:
+            if rewards.size == self._success.size:
+                moving_avg, _ = self._ma_pair(window)
+            else:
+                moving_avg = self._moving_average(rewards, window)
+            segments.append(np.column_stack([episodes[window-1:], moving_avg]))
+            colors.append(to_rgba('red'))
+            linewidths.append(2)
+            handles.append(Line2D([], [], color='red', linewidth=2,
+                                  label=f'{window}-Episode Average'))
+
+        ax.add_collection(LineCollection(segments, colors=colors, linewidths=linewidths))
+        ax.autoscale_view()
+
         ax.set_xlabel('Episode')
         ax.set_ylabel('Reward')
         ax.set_title('Learning Curve')
-        ax.legend()
+        ax.legend(handles=handles)
         ax.grid(True, alpha=0.3)
         
     def plot_success_rate(self, ax):
         """Plot success rate over episodes"""
-        episodes = range(len(self.metrics["success_rates"]))
-        success_rates = [sr * 100 for sr in self.metrics["success_rates"]]
-        
-        ax.plot(episodes, success_rates, alpha=0.3, color='green', label='Success Rate')
-        
-        # Moving average
-        window = min(10, len(success_rates) // 4)
-        if len(success_rates) >= window:
-            moving_avg = np.convolve(success_rates, np.ones(window)/window, mode='valid')
-            ax.plot(range(window-1, len(success_rates)), moving_avg,
-                   color='darkgreen', linewidth=2, label=f'{window}-Episode Average')
-        
+        _ensure_style()
+        success_rates = self._success
+        episodes = self._episode_idx[:success_rates.size]
+
+        # Raw series plus moving average batched into one LineCollection
+        segments = [np.column_stack([episodes, success_rates])]
+        colors = [to_rgba('green', 0.3)]
+        linewidths = [1.5]
+        handles = [Line2D([], [], color='green', alpha=0.3, label='Success Rate')]
+
+        window = min(10, success_rates.size // 4)
+        if window > 0:
+            if success_rates.size == self._rewards.size:
+                _, moving_avg = self._ma_pair(window)
+            else:
+                moving_avg = self._moving_average(success_rates, window)
+            segments.append(np.column_stack([episodes[window-1:], moving_avg]))
+            colors.append(to_rgba('darkgreen'))
+            linewidths.append(2)
+            handles.append(Line2D([], [], color='darkgreen', linewidth=2,
+                                  label=f'{window}-Episode Average'))
+
+        ax.add_collection(LineCollection(segments, colors=colors, linewidths=linewidths))
+        ax.autoscale_view()
+
         ax.set_xlabel('Episode')
         ax.set_ylabel('Success Rate (%)')
         ax.set_title('Success Rate Evolution')
-        ax.legend()
+        ax.legend(handles=handles)
         ax.grid(True, alpha=0.3)
         
     def plot_action_distribution(self, ax):
         """Plot distribution of selected actions"""
-        actions = ['Easy', 'Medium', 'Hard', 'Expert']
-        counts = self.metrics["action_distribution"]
-        colors = ['#2ecc71', '#3498db', '#f39c12', '#e74c3c']
-        
-        bars = ax.bar(actions, counts, color=colors)
-        
-        # Add percentage labels
-        total = sum(counts)
-        for bar, count in zip(bars, counts):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{count:.0f}\n({count/total*100:.1f}%)',
-                   ha='center', va='bottom')
+        counts = self._action_counts
+
+        bars = ax.bar(_ACTION_LABELS, counts, color=_ACTION_COLORS)
+
+        # Percentages in one vectorized divide, labels in one artist batch
+        # instead of four ax.text calls; all-zero counts label as 0%
+        total = counts.sum()
+        pct = counts * (100.0 / total) if total else counts
+        labels = [f'{c:.0f}\n({p:.1f}%)' for c, p in zip(counts, pct)]
+        ax.bar_label(bars, labels=labels, padding=0)
         
         ax.set_xlabel('Difficulty Level')
         ax.set_ylabel('Selection Count')
@@ -114,11 +463,12 @@ class Visualizer:
         
     def plot_performance_evolution(self, ax):
         """Plot learner performance over episodes"""
-        episodes = range(len(self.metrics["performance_history"]))
-        performance = [p * 100 for p in self.metrics["performance_history"]]
+        performance = self._perf
+        episodes = self._episode_idx[:performance.size]
         
         ax.plot(episodes, performance, color='purple', linewidth=2)
-        ax.fill_between(episodes, 0, performance, alpha=0.3, color='purple')
+        ax.fill_between(episodes, 0, performance, alpha=0.3, color='purple',
+                       rasterized=True)
         
         ax.set_xlabel('Episode')
         ax.set_ylabel('Performance Level (%)')
@@ -132,17 +482,20 @@ class Visualizer:
         
     def plot_q_table_growth(self, ax):
         """Plot Q-table size growth"""
-        if not self.metrics["q_table_sizes"] or all(s == 0 for s in self.metrics["q_table_sizes"]):
+        # One C-level scan of the cached array instead of a Python
+        # generator over boxed ints
+        if self._qsizes.size == 0 or not self._qsizes.any():
             ax.text(0.5, 0.5, 'N/A for this agent type', 
                    ha='center', va='center', transform=ax.transAxes, fontsize=12)
             ax.set_title('Q-Table Growth')
             return
         
-        episodes = range(len(self.metrics["q_table_sizes"]))
-        sizes = self.metrics["q_table_sizes"]
+        sizes = self._qsizes
+        episodes = self._episode_idx[:sizes.size]
         
         ax.plot(episodes, sizes, color='orange', linewidth=2)
-        ax.fill_between(episodes, 0, sizes, alpha=0.3, color='orange')
+        ax.fill_between(episodes, 0, sizes, alpha=0.3, color='orange',
+                       rasterized=True)
         
         ax.set_xlabel('Episode')
         ax.set_ylabel('Number of States')
@@ -151,13 +504,20 @@ class Visualizer:
         
     def plot_reward_distribution(self, ax):
         """Plot histogram of rewards"""
-        rewards = self.metrics["episode_rewards"]
-        
-        ax.hist(rewards, bins=20, color='teal', alpha=0.7, edgecolor='black')
-        ax.axvline(np.mean(rewards), color='red', linestyle='--', 
-                  linewidth=2, label=f'Mean: {np.mean(rewards):.2f}')
-        ax.axvline(np.median(rewards), color='orange', linestyle='--',
-                  linewidth=2, label=f'Median: {np.median(rewards):.2f}')
+        rewards = self._rewards
+        if rewards.size == 0:
+            ax.text(0.5, 0.5, 'No rewards recorded',
+                   ha='center', va='center', transform=ax.transAxes, fontsize=12)
+            ax.set_title('Reward Distribution')
+            return
+
+        counts, edges = _hist_cached(rewards.tobytes(), 20)
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+              color='teal', alpha=0.7, edgecolor='black')
+        ax.axvline(self._rewards_mean, color='red', linestyle='--',
+                  linewidth=2, label=f'Mean: {self._rewards_mean:.2f}')
+        ax.axvline(self._rewards_median, color='orange', linestyle='--',
+                  linewidth=2, label=f'Median: {self._rewards_median:.2f}')
         
         ax.set_xlabel('Episode Reward')
         ax.set_ylabel('Frequency')
@@ -167,103 +527,23 @@ class Visualizer:
         
     def generate_html_report(self, results: Dict, save_path: str):
         """Generate HTML report with results"""
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>RL Experiment Report</title>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    margin: 40px;
-                    background-color: #f5f5f5;
-                }}
-                h1 {{
-                    color: #333;
-                    border-bottom: 3px solid #4CAF50;
-                    padding-bottom: 10px;
-                }}
-                .metrics {{
-                    display: grid;
-                    grid-template-columns: repeat(3, 1fr);
-                    gap: 20px;
-                    margin: 30px 0;
-                }}
-                .metric-card {{
-                    background: white;
-                    padding: 20px;
-                    border-radius: 8px;
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                }}
-                .metric-label {{
-                    color: #666;
-                    font-size: 14px;
-                    margin-bottom: 5px;
-                }}
-                .metric-value {{
-                    color: #333;
-                    font-size: 24px;
-                    font-weight: bold;
-                }}
-                .success {{
-                    color: #4CAF50;
-                }}
-                .warning {{
-                    color: #FF9800;
-                }}
-            </style>
-        </head>
-        <body>
-            <h1>🚀 Reinforcement Learning Experiment Report</h1>
-            
-            <h2>Configuration</h2>
-            <p><strong>Algorithm:</strong> {results['agent_type'].upper()}</p>
-            <p><strong>Episodes:</strong> {results['total_episodes']}</p>
-            <p><strong>Execution Time:</strong> {results['execution_time']:.2f} seconds</p>
-            
-            <h2>Performance Metrics</h2>
-            <div class="metrics">
-                <div class="metric-card">
-                    <div class="metric-label">Average Reward</div>
-                    <div class="metric-value">{results['avg_reward']:.2f}</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-label">Final Success Rate</div>
-                    <div class="metric-value success">{results['final_success_rate']:.1%}</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-label">Performance Improvement</div>
-                    <div class="metric-value">{results.get('improvement', 0):.1f}%</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-label">Max Reward</div>
-                    <div class="metric-value">{results['max_reward']:.2f}</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-label">Convergence</div>
-                    <div class="metric-value">{results['convergence_episode'] or 'N/A'}</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-label">Q-Table Size</div>
-                    <div class="metric-value">{results['final_q_table_size']}</div>
-                </div>
-            </div>
-            
-            <h2>Action Distribution</h2>
-            <p>Easy: {results['action_distribution'][0]:.0f} selections</p>
-            <p>Medium: {results['action_distribution'][1]:.0f} selections</p>
-            <p>Hard: {results['action_distribution'][2]:.0f} selections</p>
-            <p>Expert: {results['action_distribution'][3]:.0f} selections</p>
-            
-            <p style="margin-top: 40px; color: #666; font-size: 12px;">
-                Generated: {import_datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-            </p>
-        </body>
-        </html>
-        """
-        
-        # Fix the datetime import issue
-        from datetime import datetime as import_datetime
-        
+        context = {
+            "agent_type": results["agent_type"].upper(),
+            "total_episodes": results["total_episodes"],
+            "execution_time": results["execution_time"],
+            "avg_reward": results["avg_reward"],
+            "final_success_rate": results["final_success_rate"],
+            "improvement": results.get("improvement", 0),
+            "max_reward": results["max_reward"],
+            "convergence": results["convergence_episode"] or "N/A",
+            "final_q_table_size": results["final_q_table_size"],
+            "dist_easy": results["action_distribution"][0],
+            "dist_medium": results["action_distribution"][1],
+            "dist_hard": results["action_distribution"][2],
+            "dist_expert": results["action_distribution"][3],
+            "now": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+        # One format pass over the interned template, one write call
         with open(save_path, 'w') as f:
-            f.write(html_content)
\ No newline at end of file
+            f.write(_HTML_TEMPLATE.format_map(context))